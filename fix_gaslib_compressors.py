@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# Repair tool for GasLib CompressorStations (.cs) XML files.
+#
+# GasLib distributions occasionally ship compressor stations with missing or
+# out-of-order characteristic coefficients (n_isoline_coeff_*, surgeline_*,
+# power_fun_coeff_*, ...), which makes them fail XSD validation. This script
+# fills in any missing coefficient elements with a value of "0" and restores
+# the schema-mandated child order, so the files validate again.
+#
+# The file is stream-parsed with lxml's iterparse, one compressorStation at a
+# time, and written incrementally through etree.xmlfile. Peak memory stays
+# bounded by the size of a single station instead of the whole document.
+#
+# Usage:
+#   python fix_gaslib_compressors.py INPUT.cs [-o OUTPUT.cs]
+import argparse
+import contextlib
+import logging
+import sys
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+CS_NS = "http://gaslib.zib.de/CompressorStations"
+GAS_NS = "http://gaslib.zib.de/Gas"
+NSMAP = {None: CS_NS, "gas": GAS_NS}
+
+
+def qname(localname):
+    """Return the Clark-notation tag for a CompressorStations element"""
+    return f"{{{CS_NS}}}{localname}"
+
+
+# Child elements the CompressorStations schema expects, in schema order.
+# Stored as (localname, qualified tag) pairs so the qualified string is
+# built once at import instead of per synthesized element.
+TURBO_EXPECTED = [
+    (name, qname(name))
+    for name in (
+        ["speedMin", "speedMax"]
+        + [f"n_isoline_coeff_{i}" for i in range(1, 10)]
+        + [f"eta_ad_isoline_coeff_{i}" for i in range(1, 10)]
+        + [f"surgeline_coeff_{i}" for i in range(1, 4)]
+        + [f"chokeline_coeff_{i}" for i in range(1, 4)]
+    )
+]
+
+GASTURBINE_EXPECTED = [
+    (name, qname(name))
+    for name in (
+        [f"energy_rate_fun_coeff_{i}" for i in range(1, 4)]
+        + [f"power_fun_coeff_{i}" for i in range(1, 10)]
+    )
+]
+
+# Precomputed Clark-notation tags for the hot loops, so no tag strings are
+# formatted per station.
+STATION_TAG = qname("compressorStation")
+TURBO_TAG = qname("turboCompressor")
+GASTURBINE_TAG = qname("gasTurbine")
+
+
+def ensure_children_in_order(parent, expected):
+    """
+    Make sure parent contains every expected child, in schema order.
+
+    Missing coefficients are synthesized with value="0". Children that are
+    not part of the expected list (comments, vendor extensions) are kept
+    after the expected block. Returns the list of local names that were added.
+    """
+    # Fast path: on an already-repaired file nothing is missing and the
+    # order matches, so skip the rebuild entirely.
+    existing_order = [c.tag.rpartition("}")[2] for c in parent
+                      if isinstance(c.tag, str)]
+    expected_order = [localname for localname, _tag in expected]
+    if existing_order[:len(expected_order)] == expected_order:
+        return []
+
+    existing = {}
+    for child in parent:
+        if isinstance(child.tag, str):
+            existing[child.tag.rpartition("}")[2]] = child
+
+    added = []
+    new_children = []
+    for localname, tag in expected:
+        child = existing.pop(localname, None)
+        if child is None:
+            # One libxml2 call with the attribute dict; the namespace is
+            # inherited from the root, so no per-child xmlns declaration.
+            child = etree.Element(tag, {"value": "0"})
+            added.append(localname)
+        new_children.append(child)
+
+    # Preserve any remaining (unexpected) children at the end.
+    new_children.extend(existing.values())
+
+    # Single C-level replace; per-child remove() is O(n) each and turns the
+    # rebuild quadratic on stations with many coefficients.
+    parent[:] = new_children
+
+    return added
+
+
+def process_file(inpath, outpath):
+    """
+    Stream-repair a CompressorStations file.
+
+    Each compressorStation element is fixed and written out as soon as its
+    end tag is seen, then cleared (along with already-processed siblings) so
+    the in-memory tree never holds more than one station.
+    """
+    added_total = {}
+
+    # remove_blank_text drops whitespace-only text nodes (roughly half the
+    # nodes in an indented GasLib file); huge_tree tolerates the very large
+    # coefficient tables seen in production data.
+    context = etree.iterparse(
+        inpath,
+        events=("end",),
+        tag=STATION_TAG,
+        remove_blank_text=True,
+        huge_tree=True,
+        collect_ids=False,
+        resolve_entities=False,
+    )
+
+    with contextlib.ExitStack() as stack:
+        xf = stack.enter_context(etree.xmlfile(outpath, encoding="UTF-8"))
+        xf.write_declaration()
+        root_open = False
+
+        for _event, station in context:
+            if not root_open:
+                # By the first station's end tag the root's start tag has
+                # been parsed, so reproduce it faithfully (tag, attributes,
+                # namespace declarations) instead of hardcoding it.
+                root = station.getparent()
+                stack.enter_context(
+                    xf.element(root.tag, attrib=dict(root.attrib),
+                               nsmap=root.nsmap)
+                )
+                root_open = True
+
+            station_id = station.get("id", "?")
+
+            # One in-order walk over the station yields both element kinds.
+            for unit in station.iter(TURBO_TAG, GASTURBINE_TAG):
+                if unit.tag == TURBO_TAG:
+                    added = ensure_children_in_order(unit, TURBO_EXPECTED)
+                else:
+                    added = ensure_children_in_order(unit, GASTURBINE_EXPECTED)
+                if added:
+                    added_total[f"{station_id}/{unit.get('id', '?')}"] = added
+
+            xf.write(station, pretty_print=True)
+
+            # Free the station and any fully-processed preceding siblings.
+            station.clear()
+            while station.getprevious() is not None:
+                del station.getparent()[0]
+
+        if not root_open:
+            # Input contained no stations; emit an empty root.
+            stack.enter_context(xf.element(qname("compressorStations"),
+                                           nsmap=NSMAP))
+
+    del context
+    return added_total
+
+
+def validate_file(path, schema):
+    """
+    Validate a repaired file against a compiled XMLSchema.
+
+    Returns a list of error strings (empty when the file is valid). Uses
+    lxml's libxml2-backed validator, which is far faster than re-running
+    an external Python XSD validator, and reports source lines directly.
+    """
+    doc = etree.parse(path)
+    if schema.validate(doc):
+        return []
+    return [f"{path}:{err.line}: {err.message}" for err in schema.error_log]
+
+
+def derive_outpath(inpath):
+    """Default output path for an input file"""
+    if inpath.endswith(".cs"):
+        return inpath[:-3] + ".fixed.cs"
+    return inpath + ".fixed"
+
+
+def _report(inpath, outpath, added):
+    if added:
+        for unit, names in added.items():
+            print(f"{unit}: added {len(names)} element(s): {', '.join(names)}")
+    else:
+        print(f"{inpath}: no missing elements found.")
+    print(f"Wrote {outpath}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fill in missing coefficient elements in GasLib "
+                    "CompressorStations (.cs) XML files."
+    )
+    parser.add_argument("inputs", nargs="+", metavar="INPUT",
+                        help="Input CompressorStations XML file(s)")
+    parser.add_argument("-o", "--output",
+                        help="Output file (single input only; default: "
+                             "INPUT with .fixed.cs suffix)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes for batch repairs "
+                             "(default: 1)")
+    parser.add_argument("--schema", metavar="XSD",
+                        help="Validate repaired files against this "
+                             "CompressorStations XSD and report remaining "
+                             "problems")
+    args = parser.parse_args(argv)
+
+    # Compile the schema once; it is reused for every repaired file.
+    schema = etree.XMLSchema(etree.parse(args.schema)) if args.schema else None
+
+    def check(outpath):
+        if schema is None:
+            return 0
+        errors = validate_file(outpath, schema)
+        for error in errors:
+            print(error)
+        return len(errors)
+
+    invalid = 0
+
+    if args.output and len(args.inputs) > 1:
+        parser.error("--output can only be used with a single input file")
+
+    if len(args.inputs) == 1:
+        outpath = args.output or derive_outpath(args.inputs[0])
+        _report(args.inputs[0], outpath, process_file(args.inputs[0], outpath))
+        return 1 if check(outpath) else 0
+
+    # Each file is independent and CPU-bound inside libxml2, so batch
+    # repairs scale near-linearly across worker processes.
+    jobs = [(inpath, derive_outpath(inpath)) for inpath in args.inputs]
+
+    if args.jobs > 1:
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {pool.submit(process_file, inp, out): (inp, out)
+                       for inp, out in jobs}
+            for future in concurrent.futures.as_completed(futures):
+                inpath, outpath = futures[future]
+                _report(inpath, outpath, future.result())
+                invalid += check(outpath)
+    else:
+        for inpath, outpath in jobs:
+            _report(inpath, outpath, process_file(inpath, outpath))
+            invalid += check(outpath)
+
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -1,4 +1,5 @@
 # gas_sim/settings.py
+import functools
 import os
 import dj_database_url
 
@@ -46,8 +47,17 @@ TEMPLATES = [
 
 # Database configuration - PostgreSQL
 # Use the dedicated user 'gas_user' that has full permissions
-DATABASES = {
-    'default': {
+@functools.lru_cache(maxsize=None)
+def _default_database():
+    """Resolve the default database config once per process.
+
+    DATABASE_URL (if set) takes precedence and is parsed a single time;
+    repeated settings access never re-runs the URL parsing.
+    """
+    database_url = os.environ.get('DATABASE_URL')
+    if database_url:
+        return dj_database_url.parse(database_url)
+    return {
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': 'gas_sim',
         'USER': 'gas_user',
@@ -55,6 +65,9 @@ DATABASES = {
         'HOST': 'localhost',
         'PORT': '5432',
     }
+
+DATABASES = {
+    'default': _default_database(),
 }
 
 STATIC_URL = '/static/'
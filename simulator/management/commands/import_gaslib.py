@@ -0,0 +1,76 @@
+# Import GasLib .net network files from the command line
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from simulator.services.gaslib_parser import GasLibParser, file_sha256
+
+
+def _parse_one(args):
+    """Worker: parse (and optionally validate) one .net file.
+
+    Runs in a separate process; lxml does the heavy lifting there while
+    the parent keeps sole ownership of the database. The returned parse
+    result is a plain-Python record container, so it pickles cleanly.
+    """
+    path, xsd_path = args
+    # Connections inherited across fork must not be shared; each worker
+    # would get fresh ones on first use, but it never touches the DB.
+    connections.close_all()
+    return GasLibParser(path, xsd_path=xsd_path).parse_document()
+
+
+class Command(BaseCommand):
+    help = ('Import one or more GasLib .net files. Existing network data '
+            'is cleared first; each file becomes one GasNetwork.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('xmlpaths', nargs='+',
+                            help='Path(s) to GasLib .net files')
+        parser.add_argument('--xsd', default=None,
+                            help='Validate inputs against this XML Schema '
+                                 'during the parse pass')
+        parser.add_argument('--jobs', type=int, default=None,
+                            help='Worker processes for multi-file parsing '
+                                 '(default: one per file, capped at CPUs)')
+
+    def handle(self, *args, **options):
+        paths = options['xmlpaths']
+        xsd = options['xsd']
+
+        for path in paths:
+            if not os.path.exists(path):
+                raise CommandError(f'GasLib file not found: {path}')
+
+        if len(paths) == 1:
+            # Single file: keep the simple in-process path.
+            network = GasLibParser(paths[0], xsd_path=xsd).parse_and_create_network()
+            self._report(paths[0], network)
+            return
+
+        # Fan the CPU-bound XML parsing out to worker processes (lxml
+        # releases the GIL, and each worker parses independently). All
+        # database writes stay in this process so the destructive
+        # clear happens exactly once, before any network is created.
+        jobs = options['jobs'] or min(len(paths), os.cpu_count() or 1)
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_parse_one, [(p, xsd) for p in paths]))
+
+        # Clear and recreate in one transaction, exactly like the
+        # single-file path: if any file fails to import, the previous
+        # data is left untouched instead of a wiped, partial state.
+        with transaction.atomic():
+            GasLibParser.clear_network_data()
+            for path, result in zip(paths, results):
+                network = GasLibParser(path, xsd_path=xsd).create_network(
+                    result, source_hash=file_sha256(path))
+                self._report(path, network)
+
+    def _report(self, path, network):
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {network.name} from {path}: '
+            f'{network.nodes.count()} nodes, {network.pipes.count()} pipes'
+        ))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.17 on 2026-09-01 16:51
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0005_compressor_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gasnetwork',
+            name='description',
+            field=models.TextField(default='Gas network with 24 nodes and 19 pipes'),
+        ),
+        migrations.AlterField(
+            model_name='gasnetwork',
+            name='name',
+            field=models.CharField(default='GasLib-24', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='node',
+            index=django.contrib.postgres.indexes.BTreeIndex(fields=['network', 'node_id'], name='simulator_n_network_2d83e2_btree'),
+        ),
+        migrations.AddIndex(
+            model_name='node',
+            index=django.contrib.postgres.indexes.BTreeIndex(fields=['node_type'], name='simulator_n_node_ty_12cfe6_btree'),
+        ),
+        migrations.AddIndex(
+            model_name='pipe',
+            index=django.contrib.postgres.indexes.BTreeIndex(fields=['network'], name='simulator_p_network_33535a_btree'),
+        ),
+        migrations.AddIndex(
+            model_name='pipe',
+            index=django.contrib.postgres.indexes.BTreeIndex(fields=['from_node', 'to_node'], name='simulator_p_from_no_c6e1ba_btree'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.17 on 2026-09-01 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0006_alter_gasnetwork_description_alter_gasnetwork_name_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='plc',
+            name='counters',
+        ),
+        migrations.RemoveField(
+            model_name='plc',
+            name='memory',
+        ),
+        migrations.RemoveField(
+            model_name='plc',
+            name='timers',
+        ),
+        migrations.AddField(
+            model_name='plc',
+            name='state',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.17 on 2026-09-01 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0007_remove_plc_counters_remove_plc_memory_and_more'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='simulationtimeseriesdata',
+            constraint=models.UniqueConstraint(fields=('simulation_run', 'timestamp', 'measurement_type', 'object_id'), name='uq_simts_run_ts_type_obj'),
+        ),
+    ]
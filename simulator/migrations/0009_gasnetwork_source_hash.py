@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-09-01 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0008_simulationtimeseriesdata_uq_simts_run_ts_type_obj'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gasnetwork',
+            name='source_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
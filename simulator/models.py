@@ -11,6 +11,9 @@ class GasNetwork(models.Model):
     name = models.CharField(max_length=100, default="GasLib-24")
     description = models.TextField(default="Gas network with 24 nodes and 19 pipes")
     created = models.DateTimeField(auto_now_add=True)
+    # SHA-256 of the source .net file; lets the parser skip a reimport
+    # when the file is unchanged.
+    source_hash = models.CharField(max_length=64, blank=True, default='')
     
     def __str__(self):
         return self.name
@@ -62,6 +65,17 @@ class Node(models.Model):
     def __str__(self):
         return f"{self.node_id} ({self.get_node_type_display()})"
 
+    class Meta:
+        indexes = [
+            BTreeIndex(fields=['network', 'node_id']),
+            BTreeIndex(fields=['node_type']),
+        ]
+
+class PipeManager(models.Manager):
+    """Pre-join the FKs that Pipe.__str__ and list views dereference."""
+    def get_queryset(self):
+        return super().get_queryset().select_related('from_node', 'to_node')
+
 class Pipe(models.Model):
     """Represents pipes connecting nodes in the network"""
     network = models.ForeignKey(GasNetwork, on_delete=models.CASCADE, related_name='pipes')
@@ -82,11 +96,24 @@ class Pipe(models.Model):
     
     # Additional properties
     properties = models.JSONField(default=dict, blank=True)
-    
+
+    objects = PipeManager()
+
     def __str__(self):
         return f"{self.pipe_id}: {self.from_node.node_id} → {self.to_node.node_id}"
 
+    class Meta:
+        indexes = [
+            BTreeIndex(fields=['network']),
+            BTreeIndex(fields=['from_node', 'to_node']),
+        ]
+
 # Sensor Models (Simplified - only pressure, temperature, flow)
+class SensorManager(models.Manager):
+    """Pre-join the node/pipe FKs used when rendering sensors."""
+    def get_queryset(self):
+        return super().get_queryset().select_related('node', 'pipe')
+
 class Sensor(models.Model):
     """Simplified sensor system - pressure, temperature, flow only"""
     SENSOR_TYPES = [
@@ -111,12 +138,19 @@ class Sensor(models.Model):
     min_value = models.FloatField(null=True, blank=True)
     max_value = models.FloatField(null=True, blank=True)
     calibration_date = models.DateTimeField(auto_now_add=True)
-    
+
+    objects = SensorManager()
+
     def __str__(self):
         location = self.node.node_id if self.node else self.pipe.pipe_id
         return f"{self.sensor_id} ({self.get_sensor_type_display()}) @ {location}"
 
 # PLC Models - Embedded 8 PLCs
+class PLCManager(models.Manager):
+    """Pre-join the node FK used when rendering PLCs."""
+    def get_queryset(self):
+        return super().get_queryset().select_related('node')
+
 class PLC(models.Model):
     """Represents Programmable Logic Controllers"""
     PLC_TYPES = [
@@ -139,19 +173,26 @@ class PLC(models.Model):
     scan_time = models.FloatField(default=0.1)  # seconds
     last_scan = models.DateTimeField(auto_now=True)
     
-    # PLC data stored as JSON
+    # PLC data stored as JSON. Internal scan state (memory words, timers,
+    # counters) lives in one 'state' column keyed by category, so each
+    # save serializes one blob instead of three.
     inputs = models.JSONField(default=dict, blank=True)
     outputs = models.JSONField(default=dict, blank=True)
-    memory = models.JSONField(default=dict, blank=True)
-    timers = models.JSONField(default=dict, blank=True)
-    counters = models.JSONField(default=dict, blank=True)
+    state = models.JSONField(default=dict, blank=True)
     
     # Control parameters (specific to PLC type)
     parameters = models.JSONField(default=dict, blank=True)
-    
+
+    objects = PLCManager()
+
     def __str__(self):
         return f"{self.plc_id} ({self.get_plc_type_display()}) @ {self.node.node_id}"
 
+class PLCAlarmManager(models.Manager):
+    """Pre-join the plc FK used when rendering alarms."""
+    def get_queryset(self):
+        return super().get_queryset().select_related('plc')
+
 class PLCAlarm(models.Model):
     """PLC alarms and events"""
     SEVERITY_CHOICES = [
@@ -169,7 +210,9 @@ class PLCAlarm(models.Model):
     acknowledged = models.BooleanField(default=False)
     acknowledged_by = models.CharField(max_length=100, blank=True)
     acknowledged_at = models.DateTimeField(null=True, blank=True)
-    
+
+    objects = PLCAlarmManager()
+
     def __str__(self):
         return f"{self.plc.plc_id}: {self.alarm_id} ({self.severity})"
     
@@ -181,6 +224,11 @@ class PLCAlarm(models.Model):
         ]
 
 # Valve Models
+class ValveManager(models.Manager):
+    """Pre-join the pipe/plc FKs used when rendering valves."""
+    def get_queryset(self):
+        return super().get_queryset().select_related('pipe', 'plc')
+
 class Valve(models.Model):
     """Represents valves in the pipeline system"""
     VALVE_TYPES = [
@@ -208,7 +256,9 @@ class Valve(models.Model):
     # Valve properties
     max_pressure = models.FloatField(default=100.0)  # bar
     flow_coefficient = models.FloatField(default=1.0)
-    
+
+    objects = ValveManager()
+
     def __str__(self):
         return f"{self.valve_id} ({self.get_valve_type_display()}) @ {self.pipe.pipe_id}"
     
@@ -220,6 +270,11 @@ class Valve(models.Model):
         ]
 
 # Compressor Models
+class CompressorManager(models.Manager):
+    """Pre-join the node FK used when rendering compressors."""
+    def get_queryset(self):
+        return super().get_queryset().select_related('node')
+
 class Compressor(models.Model):
     """Represents compressor units in the pipeline system"""
     COMPRESSOR_STATUS_CHOICES = [
@@ -247,7 +302,9 @@ class Compressor(models.Model):
 
     max_speed = models.FloatField(default=15000.0)
     max_pressure_ratio = models.FloatField(default=1.5)
-    
+
+    objects = CompressorManager()
+
     def __str__(self):
         return f"{self.compressor_id} ({self.get_status_display()}) @ {self.node.node_id}"
 
@@ -310,6 +367,16 @@ class SimulationTimeSeriesData(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        constraints = [
+            # One row per object per step; the backing unique index also
+            # serves filter(simulation_run=...).order_by('timestamp')
+            # scans without a secondary sort.
+            models.UniqueConstraint(
+                fields=['simulation_run', 'timestamp',
+                        'measurement_type', 'object_id'],
+                name='uq_simts_run_ts_type_obj',
+            ),
+        ]
         indexes = [
             BTreeIndex(fields=['simulation_run', 'timestamp']),
             BTreeIndex(fields=['simulation_run', 'object_id']),
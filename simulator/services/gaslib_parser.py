@@ -1,130 +1,323 @@
 # GasLib-24 XML Parser for Django Models
-import xml.etree.ElementTree as ET
+from lxml import etree as ET
+import functools
+import hashlib
 import logging
+import numpy as np
 from django.conf import settings
-from ..models import GasNetwork, Node, Pipe
+from django.db import router, transaction
+from ..models import (
+    GasNetwork, Node, Pipe, Sensor, PLC, PLCAlarm, Valve, Compressor,
+    SimulationRun, SimulationTimeSeriesData, Run
+)
 
 logger = logging.getLogger(__name__)
 
+GAS_NS = 'http://gaslib.zib.de/Gas'
+FRAMEWORK_NS = 'http://gaslib.zib.de/Framework'
+NAMESPACES = {'gas': GAS_NS, 'framework': FRAMEWORK_NS}
+
+# Clark-notation tags, precomputed once so per-element comparisons and
+# dict lookups skip prefix resolution entirely.
+TITLE_TAG = '{%s}title' % FRAMEWORK_NS
+DOCUMENTATION_TAG = '{%s}documentation' % FRAMEWORK_NS
+
+SOURCE_TAG = '{%s}source' % GAS_NS
+SINK_TAG = '{%s}sink' % GAS_NS
+INNODE_TAG = '{%s}innode' % GAS_NS
+PIPE_TAG = '{%s}pipe' % GAS_NS
+
+HEIGHT_TAG = '{%s}height' % GAS_NS
+PRESSURE_MIN_TAG = '{%s}pressureMin' % GAS_NS
+PRESSURE_MAX_TAG = '{%s}pressureMax' % GAS_NS
+FLOW_MIN_TAG = '{%s}flowMin' % GAS_NS
+FLOW_MAX_TAG = '{%s}flowMax' % GAS_NS
+GAS_TEMPERATURE_TAG = '{%s}gasTemperature' % GAS_NS
+CALORIFIC_VALUE_TAG = '{%s}calorificValue' % GAS_NS
+NORM_DENSITY_TAG = '{%s}normDensity' % GAS_NS
+LENGTH_TAG = '{%s}length' % GAS_NS
+DIAMETER_TAG = '{%s}diameter' % GAS_NS
+ROUGHNESS_TAG = '{%s}roughness' % GAS_NS
+
+_NODE_KINDS = {SOURCE_TAG: 'source', SINK_TAG: 'sink', INNODE_TAG: 'innode'}
+
+
+# Numeric child-value columns as (tag, default, unit scale). GasLib
+# stores pipe diameter and roughness in mm; the model wants metres.
+_NODE_COLUMNS = (
+    (HEIGHT_TAG, 0.0, 1.0),
+    (PRESSURE_MIN_TAG, 1.01325, 1.0),
+    (PRESSURE_MAX_TAG, 81.01325, 1.0),
+    (FLOW_MIN_TAG, 0.0, 1.0),
+    (FLOW_MAX_TAG, 10000.0, 1.0),
+    (GAS_TEMPERATURE_TAG, 20.0, 1.0),
+    (CALORIFIC_VALUE_TAG, 36.4543670654, 1.0),
+    (NORM_DENSITY_TAG, 0.785, 1.0),
+)
+_PIPE_COLUMNS = (
+    (LENGTH_TAG, 10.0, 1.0),
+    (DIAMETER_TAG, 500.0, 1e-3),
+    (ROUGHNESS_TAG, 0.05, 1e-3),
+)
+
+
+def _vectorize_columns(records, columns):
+    """Convert child-value strings to floats one column at a time.
+
+    A single np.asarray call converts the whole column in C instead of
+    one float() per record, and unit scaling is one vector multiply.
+    Converted values (with defaults filled in) are written back into
+    the records, so the model builders read ready-to-use floats.
+    """
+    for tag, default, scale in columns:
+        values = np.asarray([rec.get(tag, default) for rec in records],
+                            dtype=np.float64)
+        if scale != 1.0:
+            values *= scale
+        for rec, value in zip(records, values.tolist()):
+            rec[tag] = value
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file's bytes, streamed in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=8)
+def _compiled_schema(xsd_path):
+    """Compile an XML Schema once per process.
+
+    Schema compilation dominates validation cost for small documents,
+    so repeated imports against the same .xsd share one XMLSchema.
+    (XMLSchema objects cannot be pickled, so the cache is per-process.)
+    """
+    return ET.XMLSchema(file=xsd_path)
+
+
+class _GasLibTarget:
+    """SAX-style parser target that extracts records without Elements.
+
+    GasLib node/pipe elements are shallow: attributes on the element
+    itself plus flat ``<gas:X value="..."/>`` children. Building full
+    Element objects just to read one attribute each is pure overhead,
+    so this target collects each element's attributes and child values
+    into a plain dict as the parse events stream by. Child values are
+    keyed by their Clark-notation tag, which cannot collide with the
+    plain attribute names ('id', 'x', 'from', ...) stored alongside.
+    """
+
+    def __init__(self):
+        self.title = None
+        self.documentation = None
+        self.nodes = []   # (kind, record) in document order
+        self.pipes = []
+        self._cur = None
+        self._text_parts = None
+
+    def start(self, tag, attrib):
+        if self._cur is not None:
+            value = attrib.get('value')
+            if value is not None:
+                self._cur[tag] = value
+        elif tag in _NODE_KINDS or tag == PIPE_TAG:
+            self._cur = dict(attrib)
+        elif tag == TITLE_TAG or tag == DOCUMENTATION_TAG:
+            self._text_parts = []
+
+    def data(self, text):
+        # Only title/documentation text is of interest; everything else
+        # in the document is whitespace between elements.
+        if self._text_parts is not None:
+            self._text_parts.append(text)
+
+    def end(self, tag):
+        kind = _NODE_KINDS.get(tag)
+        if kind is not None:
+            self.nodes.append((kind, self._cur))
+            self._cur = None
+        elif tag == PIPE_TAG:
+            self.pipes.append(self._cur)
+            self._cur = None
+        elif tag == TITLE_TAG:
+            self.title = ''.join(self._text_parts).strip() or None
+            self._text_parts = None
+        elif tag == DOCUMENTATION_TAG:
+            self.documentation = ''.join(self._text_parts).strip() or None
+            self._text_parts = None
+
+    def close(self):
+        # etree.parse() returns this value when a target is installed.
+        return self
+
+
 class GasLibParser:
     """Parser for GasLib-24 network XML files"""
-    
-    def __init__(self, xml_file_path):
+
+    def __init__(self, xml_file_path, xsd_path=None):
         self.xml_file_path = xml_file_path
-        self.namespace = {
-            'gas': 'http://gaslib.zib.de/Gas',
-            'framework': 'http://gaslib.zib.de/Framework'
-        }
-    
+        self.xsd_path = xsd_path
+        self.namespace = NAMESPACES
+
+    @staticmethod
+    def clear_network_data():
+        """
+        Wipe all network data with flat per-table DELETEs.
+
+        GasNetwork.objects.all().delete() walks Django's cascade collector,
+        which fetches and deletes every dependent row (nodes, pipes,
+        sensors, PLCs, alarms, valves, compressors, time-series data)
+        through Python. Issuing one raw DELETE per table in child-first
+        order does the same work in O(tables) statements. Legacy Run rows
+        are kept (their simulation_run FK is nulled, matching the previous
+        SET_NULL behaviour).
+        """
+        Run.objects.update(simulation_run=None)
+
+        with transaction.atomic():
+            for model in (SimulationTimeSeriesData, PLCAlarm, Valve,
+                          Compressor, Sensor, PLC, Pipe, Node,
+                          SimulationRun, GasNetwork):
+                queryset = model.objects.all()
+                queryset._raw_delete(using=router.db_for_write(model))
+
+    def parse_document(self):
+        """Single streaming pass over the XML via a target parser.
+
+        No Element tree is ever built: the target receives start/end
+        events and accumulates plain dicts, so peak memory is one
+        record plus the collected lists. When an .xsd path was given,
+        the (cached) compiled schema is attached to the parser, so
+        validation happens incrementally during this same pass rather
+        than as a separate tree-building one.
+
+        Raises lxml.etree.DocumentInvalid if the document violates the
+        schema. With a target installed lxml only records schema
+        violations in the parser's error_log instead of raising, so the
+        log has to be checked explicitly after the parse.
+        """
+        schema = _compiled_schema(self.xsd_path) if self.xsd_path else None
+        parser = ET.XMLParser(target=_GasLibTarget(), huge_tree=True,
+                              resolve_entities=False, schema=schema)
+        result = ET.parse(self.xml_file_path, parser)
+        if schema is not None and len(parser.error_log):
+            logger.error("GasLib file %s failed schema validation: %s",
+                         self.xml_file_path, parser.error_log.last_error)
+            raise ET.DocumentInvalid(
+                f"{self.xml_file_path} failed validation against "
+                f"{self.xsd_path}: {parser.error_log.last_error}")
+        return result
+
     def parse_and_create_network(self):
         """Parse GasLib-24 XML and create Django models"""
-        try:
-            tree = ET.parse(self.xml_file_path)
-            root = tree.getroot()
-            
-            # Get network information
-            info = root.find('framework:information', self.namespace)
-            title = info.find('framework:title', self.namespace).text if info else "GasLib-24"
-            doc = info.find('framework:documentation', self.namespace).text if info else "Gas network with 24 nodes"
-            
-            # --- THIS IS THE FIX ---
-            # Delete ALL existing networks and their related components (nodes, pipes, etc.)
-            # This ensures a clean import every time.
+        # Skip the whole parse/delete/insert cycle when this exact file
+        # is already loaded (content hash match).
+        file_hash = file_sha256(self.xml_file_path)
+        existing = GasNetwork.objects.filter(source_hash=file_hash).first()
+        if existing is not None:
+            logger.info("GasLib file unchanged; keeping existing network %s",
+                        existing.name)
+            return existing
+
+        result = self.parse_document()
+
+        # Clear and recreate in one transaction: a single commit/fsync,
+        # and a failed import leaves the previous data untouched.
+        with transaction.atomic():
+            # Delete ALL existing networks and their related components
+            # (nodes, pipes, etc.). This ensures a clean import every time.
             logger.info("Deleting all existing network data before reload...")
-            GasNetwork.objects.all().delete()
+            self.clear_network_data()
             logger.info("Existing data cleared.")
-            # --- END FIX ---
+
+            return self.create_network(result, source_hash=file_hash)
+
+    def create_network(self, result, source_hash=''):
+        """Create Django models from a parsed document (see parse_document)"""
+        try:
+            title = result.title or "GasLib-24"
+            doc = result.documentation or "Gas network with 24 nodes"
 
             # Create the new network
             network = GasNetwork.objects.create(
                 name=title,
-                description=doc
+                description=doc,
+                source_hash=source_hash
             )
-            logger.info(f"Created new network: {title}")
-            
-            # Parse nodes
-            nodes_element = root.find('framework:nodes', self.namespace)
-            node_count = 0
-            
-            if nodes_element is not None:
-                # Parse sources
-                for source in nodes_element.findall('gas:source', self.namespace):
-                    self._create_node(network, source, 'source')
-                    node_count += 1
-                
-                # Parse sinks
-                for sink in nodes_element.findall('gas:sink', self.namespace):
-                    self._create_node(network, sink, 'sink')
-                    node_count += 1
-                
-                # Parse innodes (junctions)
-                for innode in nodes_element.findall('gas:innode', self.namespace):
-                    self._create_node(network, innode, 'innode')
-                    node_count += 1
-            
-            # Parse connections (pipes)
-            connections_element = root.find('framework:connections', self.namespace)
-            pipe_count = 0
-            
-            if connections_element is not None:
-                # We only parse 'pipe' elements for this simulation
-                for pipe in connections_element.findall('gas:pipe', self.namespace):
-                    self._create_pipe(network, pipe)
-                    pipe_count += 1
-                
-                # Note: compressorStation, resistor, valve elements in the .net file
-                # are also under connections, but we model them differently or ignore
-                # for this simulation's physics. Compressors and Valves are created
-                # separately by the simulation engine.
-            
-            logger.info(f"Network parsed successfully: {node_count} nodes, {pipe_count} pipes")
+            logger.info("Created new network: %s", title)
+
+            # Unsaved model instances built from the parsed records and
+            # flushed with bulk_create, so the import issues a handful of
+            # INSERTs instead of one per element.
+            #
+            # Note: compressorStation, resistor, valve elements in the .net
+            # file are also under connections, but we model them differently
+            # or ignore for this simulation's physics. Compressors and
+            # Valves are created separately by the simulation engine.
+            _vectorize_columns([record for _, record in result.nodes],
+                               _NODE_COLUMNS)
+            _vectorize_columns(result.pipes, _PIPE_COLUMNS)
+
+            node_objs = [self._build_node(network, record, kind)
+                         for kind, record in result.nodes]
+
+            with transaction.atomic():
+                Node.objects.bulk_create(node_objs, batch_size=500)
+
+                # bulk_create fills in pks, so pipe endpoints resolve from
+                # memory without any per-pipe SELECTs.
+                node_map = {node.node_id: node for node in node_objs}
+                Pipe.objects.bulk_create(
+                    [self._build_pipe(network, record, node_map)
+                     for record in result.pipes],
+                    batch_size=1000
+                )
+
+            logger.info("Network parsed successfully: %d nodes, %d pipes", len(node_objs), len(result.pipes))
             return network
-            
+
         except Exception as e:
-            logger.error(f"Error parsing GasLib file: {e}")
+            logger.error("Error parsing GasLib file: %s", e)
             raise
-    
-    def _create_node(self, network, element, node_type):
-        """Create a node from XML element"""
+
+    def _build_node(self, network, record, node_type):
+        """Build an unsaved Node from a parsed record (for bulk_create)"""
         try:
-            node_id = element.get('id')
-            alias = element.get('alias', '')
-            x = float(element.get('x', 0))
-            y = float(element.get('y', 0))
-            geo_long = element.get('geoWGS84Long')
-            geo_lat = element.get('geoWGS84Lat')
-            
+            node_id = record.get('id')
+            alias = record.get('alias', '')
+            x = float(record.get('x', 0))
+            y = float(record.get('y', 0))
+            geo_long = record.get('geoWGS84Long')
+            geo_lat = record.get('geoWGS84Lat')
+
+            # Numeric child columns were converted (and defaulted) in
+            # bulk by _vectorize_columns, keyed by Clark-notation tag.
+
             # Height
-            height_elem = element.find('gas:height', self.namespace)
-            height = float(height_elem.get('value', 0)) if height_elem is not None else 0.0
-            
+            height = record[HEIGHT_TAG]
+
             # Pressure limits
-            pressure_min_elem = element.find('gas:pressureMin', self.namespace)
-            pressure_max_elem = element.find('gas:pressureMax', self.namespace)
-            pressure_min = float(pressure_min_elem.get('value', 1.01325)) if pressure_min_elem is not None else 1.01325
-            pressure_max = float(pressure_max_elem.get('value', 81.01325)) if pressure_max_elem is not None else 81.01325
-            
+            pressure_min = record[PRESSURE_MIN_TAG]
+            pressure_max = record[PRESSURE_MAX_TAG]
+
             # Flow limits (for sources and sinks)
-            flow_min_elem = element.find('gas:flowMin', self.namespace)
-            flow_max_elem = element.find('gas:flowMax', self.namespace)
-            flow_min = float(flow_min_elem.get('value', 0)) if flow_min_elem is not None else 0.0
-            flow_max = float(flow_max_elem.get('value', 10000)) if flow_max_elem is not None else 10000.0
-            
+            flow_min = record[FLOW_MIN_TAG]
+            flow_max = record[FLOW_MAX_TAG]
+
             # Gas properties (for sources)
-            gas_temp_elem = element.find('gas:gasTemperature', self.namespace)
-            calorific_elem = element.find('gas:calorificValue', self.namespace)
-            density_elem = element.find('gas:normDensity', self.namespace)
-            
-            gas_temperature = float(gas_temp_elem.get('value', 20)) if gas_temp_elem is not None else 20.0
-            calorific_value = float(calorific_elem.get('value', 36.4543670654)) if calorific_elem is not None else 36.4543670654
-            norm_density = float(density_elem.get('value', 0.785)) if density_elem is not None else 0.785
-            
+            gas_temperature = record[GAS_TEMPERATURE_TAG]
+            calorific_value = record[CALORIFIC_VALUE_TAG]
+            norm_density = record[NORM_DENSITY_TAG]
+
             # Set initial pressure and flow
             initial_pressure = (pressure_min + pressure_max) / 2
             initial_flow = 0.0 # Will be controlled by setpoints
 
-            # Create node
-            node = Node.objects.create(
+            # Build node (saved later in one bulk_create)
+            node = Node(
                 network=network,
                 node_id=node_id,
                 node_type=node_type,
@@ -147,60 +340,42 @@ class GasLibParser:
                 calorific_value=calorific_value,
                 norm_density=norm_density
             )
-            
-            logger.debug(f"Created {node_type} node: {node_id}")
+
+            logger.debug("Built %s node: %s", node_type, node_id)
             return node
-            
+
         except Exception as e:
-            logger.error(f"Error creating node {element.get('id')}: {e}")
+            logger.error("Error creating node %s: %s", record.get('id'), e)
             raise
-    
-    def _create_pipe(self, network, element):
-        """Create a pipe from XML element"""
+
+    def _build_pipe(self, network, record, node_map):
+        """Build an unsaved Pipe from a parsed record (for bulk_create)"""
         try:
-            pipe_id = element.get('id')
-            alias = element.get('alias', '')
-            from_node_id = element.get('from')
-            to_node_id = element.get('to')
-            
-            # Get nodes
-            from_node = Node.objects.get(network=network, node_id=from_node_id)
-            to_node = Node.objects.get(network=network, node_id=to_node_id)
-            
-            # Pipe properties (defaults if not specified in XML)
-            length_elem = element.find('gas:length', self.namespace)
-            diameter_elem = element.find('gas:diameter', self.namespace)
-            roughness_elem = element.find('gas:roughness', self.namespace)
-            
-            # GasLib stores length in km, diameter in mm, roughness in mm
-            # Model stores length in km, diameter in m, roughness in m
-            
-            length = float(length_elem.get('value', 10.0)) if length_elem is not None else 10.0
-            
-            diameter_mm = float(diameter_elem.get('value', 500)) if diameter_elem is not None else 500.0
-            diameter_m = diameter_mm / 1000.0 # Convert mm to m
-            
-            roughness_mm = float(roughness_elem.get('value', 0.05)) if roughness_elem is not None else 0.05
-            roughness_m = roughness_mm / 1000.0 # Convert mm to m
-            
-            # Create pipe
-            pipe = Pipe.objects.create(
+            pipe_id = record.get('id')
+            alias = record.get('alias', '')
+            from_node_id = record.get('from')
+            to_node_id = record.get('to')
+
+            # Pipe properties were converted to model units (m) in bulk
+            # by _vectorize_columns, defaults included.
+            length = record[LENGTH_TAG]
+            diameter_m = record[DIAMETER_TAG]
+            roughness_m = record[ROUGHNESS_TAG]
+
+            logger.debug("Parsed pipe: %s (%s → %s)", pipe_id, from_node_id, to_node_id)
+            return Pipe(
                 network=network,
                 pipe_id=pipe_id,
                 alias=alias,
-                from_node=from_node,
-                to_node=to_node,
+                from_node=node_map[from_node_id],
+                to_node=node_map[to_node_id],
                 length=length,
                 diameter=diameter_m,
                 roughness=roughness_m,
                 current_flow=0.0,
                 is_active=True
             )
-            
-            logger.debug(f"Created pipe: {pipe_id} ({from_node_id} → {to_node_id})")
-            return pipe
-            
+
         except Exception as e:
-            logger.error(f"Error creating pipe {element.get('id')}: {e}")
+            logger.error("Error parsing pipe %s: %s", record.get('id'), e)
             raise
-
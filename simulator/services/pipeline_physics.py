@@ -0,0 +1,107 @@
+# Vectorized physics kernels for the simulation engine
+"""
+NumPy kernels for the per-step physics update.
+
+The engine assembles structure-of-arrays views of the network (node
+setpoints and pressures, pipe endpoint indices, valve openness) and
+these functions advance them one step with whole-array operations,
+replacing per-object Python arithmetic and per-object random draws.
+Noise comes from one Generator in single vectorized calls.
+
+The update rules mirror the original scalar code exactly:
+  source: pressure = set_pressure + N(0, 0.5)
+          flow     = set_flow if > 0 else 100 + N(0, 10)
+  sink:   pressure = sink_base_pressure + N(0, 0.5)
+          flow     = set_flow
+  innode: pressure = 50 + N(0, 1); flow unchanged
+  pipe:   flow     = max(0, dp * 2 * openness + N(0, 0.1))
+
+sink_base_pressure is the static pressure_min * 1.5 term, precomputed
+once per network by the caller rather than re-multiplied every step.
+"""
+import numpy as np
+
+# Node type codes for the int8 structure-of-arrays representation.
+NODE_TYPE_CODES = {'source': 0, 'sink': 1, 'innode': 2}
+SOURCE, SINK, INNODE = 0, 1, 2
+
+_rng = np.random.default_rng()
+
+
+def update_node_state(node_type, set_pressure, set_flow,
+                      sink_base_pressure, current_flow, rng=None):
+    """Advance all node pressures and flows one step.
+
+    Args:
+        node_type: int8 array of NODE_TYPE_CODES values.
+        set_pressure, set_flow, current_flow: float64 arrays aligned
+            with node_type.
+        sink_base_pressure: float64 array of precomputed
+            pressure_min * 1.5 values (static per network).
+        rng: optional numpy Generator (defaults to the module one).
+
+    Returns:
+        (pressure, flow) float64 arrays.
+    """
+    rng = rng if rng is not None else _rng
+    n = node_type.shape[0]
+
+    # Masked single-pass assembly: each node value is written exactly
+    # once and noise is drawn only for the nodes that need it, instead
+    # of building full-length candidate arrays for nested np.where.
+    source_idx = np.flatnonzero(node_type == SOURCE)
+    sink_idx = np.flatnonzero(node_type == SINK)
+    inner_idx = np.flatnonzero(node_type == INNODE)
+
+    pressure = np.empty(n)
+    pressure[source_idx] = (set_pressure[source_idx]
+                            + rng.normal(0.0, 0.5, source_idx.size))
+    pressure[sink_idx] = (sink_base_pressure[sink_idx]
+                          + rng.normal(0.0, 0.5, sink_idx.size))
+    pressure[inner_idx] = 50.0 + rng.normal(0.0, 1.0, inner_idx.size)
+
+    flow = current_flow.copy()
+    flow[sink_idx] = set_flow[sink_idx]
+    source_set_flow = set_flow[source_idx]
+    flow[source_idx] = np.where(
+        source_set_flow > 0, source_set_flow,
+        100.0 + rng.normal(0.0, 10.0, source_idx.size))
+
+    return pressure, flow
+
+
+def sensor_readings(base, sigma, clamp_idx, rng=None):
+    """Noisy sensor readings from true base values.
+
+    Args:
+        base: float64 array of the measured quantities.
+        sigma: float64 array of per-sensor noise standard deviations.
+        clamp_idx: indices of sensors whose readings cannot go negative
+            (pressure and flow; temperature is left unclamped).
+        rng: optional numpy Generator.
+
+    Returns:
+        float64 array of simulated readings.
+    """
+    rng = rng if rng is not None else _rng
+    values = base + rng.standard_normal(base.shape[0]) * sigma
+    values[clamp_idx] = np.maximum(values[clamp_idx], 0.0)
+    return values
+
+
+def compute_pipe_flows(pressure, from_idx, to_idx, openness, rng=None):
+    """Pipe flows from endpoint pressure differences and valve restriction.
+
+    Args:
+        pressure: float64 node pressure array (post node update).
+        from_idx, to_idx: integer index arrays into pressure.
+        openness: float64 array of valve openness fractions (0..1).
+        rng: optional numpy Generator.
+
+    Returns:
+        float64 array of non-negative pipe flows.
+    """
+    rng = rng if rng is not None else _rng
+    dp = pressure[from_idx] - pressure[to_idx]
+    flow = dp * 2.0 * openness + rng.normal(0.0, 0.1, from_idx.shape[0])
+    return np.maximum(flow, 0.0)
@@ -1,11 +1,145 @@
 # PostgreSQL Service for Time-Series Data Storage
+import csv
+import io
+import json
 import logging
+import queue
 import threading
 from django.conf import settings
+from django.db import connection, connections, transaction
 from ..models import SimulationTimeSeriesData, SimulationRun
 
 logger = logging.getLogger(__name__)
 
+class SimulationDataWriter:
+    """
+    Buffered bulk writer for SimulationTimeSeriesData rows.
+
+    Rows are accumulated in memory and flushed in batches. On PostgreSQL
+    the flush goes through COPY ... FROM STDIN (CSV), which bypasses
+    per-row ORM field preparation and INSERT parsing entirely; other
+    vendors fall back to bulk_create. Callers must flush() at the end of
+    a run — until a batch flushes, its rows are not yet visible to reads.
+    """
+
+    # ~1000 rows is several simulation steps' worth of data; large
+    # enough to amortize the COPY round-trip, small enough that the
+    # dashboard sees fresh data within a few seconds.
+    flush_every = 1000
+
+    def __init__(self, simulation_run: SimulationRun):
+        self.simulation_run = simulation_run
+        self._rows = []
+
+    def add(self, timestamp: float, measurement_type: str,
+            object_id: str, data: dict):
+        """Queue one data point; flushes automatically when full."""
+        self._rows.append((timestamp, measurement_type, object_id, data))
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows to the database."""
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        try:
+            if connection.vendor == 'postgresql':
+                self._copy_rows(rows)
+            else:
+                self._bulk_create_rows(rows)
+        except Exception as e:
+            logger.error("Failed to flush %d data points: %s", len(rows), e)
+
+    def _copy_rows(self, rows):
+        run_pk = self.simulation_run.pk
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for timestamp, measurement_type, object_id, data in rows:
+            writer.writerow((run_pk, timestamp, measurement_type,
+                             object_id, json.dumps(data)))
+        buf.seek(0)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # Simulation output is reproducible (a failed run is
+                # simply rerun), so skip the WAL fsync wait for this
+                # transaction only; durability of everything else on
+                # the connection is unaffected.
+                cursor.execute('SET LOCAL synchronous_commit TO OFF')
+                cursor.copy_expert(
+                    'COPY %s (simulation_run_id, timestamp, measurement_type,'
+                    ' object_id, data) FROM STDIN WITH (FORMAT csv)'
+                    % SimulationTimeSeriesData._meta.db_table,
+                    buf
+                )
+
+    def _bulk_create_rows(self, rows):
+        SimulationTimeSeriesData.objects.bulk_create([
+            SimulationTimeSeriesData(
+                simulation_run=self.simulation_run,
+                timestamp=timestamp,
+                measurement_type=measurement_type,
+                object_id=object_id,
+                data=data
+            )
+            for timestamp, measurement_type, object_id, data in rows
+        ])
+
+class BackgroundSimulationDataWriter:
+    """
+    Producer-consumer front for SimulationDataWriter.
+
+    add() is a plain queue append, so the simulation thread never waits
+    on database I/O; a daemon consumer thread drains the queue and does
+    the batched flushes on its own connection. close() signals the
+    consumer, waits for it to finish, and guarantees everything queued
+    beforehand has been flushed.
+    """
+
+    _STOP = object()
+
+    # With slow data rates a partial batch could sit buffered until the
+    # run ends; flush it whenever the queue stays idle this long.
+    idle_flush_seconds = 1.0
+
+    def __init__(self, simulation_run: SimulationRun):
+        self._writer = SimulationDataWriter(simulation_run)
+        self._queue = queue.Queue(maxsize=100000)
+        self._thread = threading.Thread(
+            target=self._drain,
+            name=f'tsdb-writer-{simulation_run.run_id}',
+            daemon=True
+        )
+        self._thread.start()
+
+    def add(self, timestamp: float, measurement_type: str,
+            object_id: str, data: dict):
+        """Queue one data point; never blocks on the database."""
+        self._queue.put((timestamp, measurement_type, object_id, data))
+
+    def _drain(self):
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.idle_flush_seconds)
+                except queue.Empty:
+                    # Nothing new for a while: make the partial batch
+                    # durable so dashboards see fresh data.
+                    self._writer.flush()
+                    continue
+                if item is self._STOP:
+                    break
+                self._writer.add(*item)
+            self._writer.flush()
+        finally:
+            # This thread owns its own Django connection; release it.
+            connections.close_all()
+
+    def close(self, timeout: float = 30.0):
+        """Stop the consumer and flush everything queued so far."""
+        self._queue.put(self._STOP)
+        self._thread.join(timeout=timeout)
+
 class PostgresTSDBService:
     """
     Service for handling time-series data storage in PostgreSQL.
@@ -19,23 +153,28 @@ class PostgresTSDBService:
     def is_connected(self) -> bool:
         """Check if connected to PostgreSQL (always true if Django is running)"""
         return self._connected
-        
-    def write_data_point(self, 
-                         simulation_run: SimulationRun, 
+
+    def write_data_point(self,
+                         simulation_run: SimulationRun,
                          timestamp: float,
                          measurement_type: str,
                          object_id: str,
                          data: dict) -> bool:
         """
-        Write a single time-series data point to the database.
-        
+        Write a single time-series data point.
+
+        This is the simple durable path for one-off writes: the row is
+        visible to reads as soon as the call returns. High-volume
+        streams (the simulation engine) should go through
+        SimulationDataWriter / BackgroundSimulationDataWriter instead.
+
         Args:
             simulation_run: The SimulationRun instance for this data.
             timestamp: The simulation time in seconds.
             measurement_type: The type of measurement (e.g., 'sensor_reading', 'plc_output').
             object_id: The ID of the object the data relates to (e.g., node_id, pipe_id).
             data: A dictionary containing the actual data points.
-            
+
         Returns:
             bool: True if successful, False otherwise.
         """
@@ -51,7 +190,8 @@ class PostgresTSDBService:
         except Exception as e:
             logger.error(f"Failed to write data point to PostgreSQL: {e}")
             return False
-            
+
+
     def get_simulation_data(self, simulation_id: int, limit: int = 1000):
         """
         Retrieve all time-series data for a specific simulation run.
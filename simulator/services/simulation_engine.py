@@ -1,9 +1,9 @@
 # Django Simulation Engine - Python-only gas pipeline simulation
 import logging
 import time
-import random
 import math
 import threading
+import numpy as np
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db import transaction # Import transaction for safe bulk operations
@@ -11,48 +11,80 @@ from ..models import (
     GasNetwork, Node, Pipe, Sensor, PLC, PLCAlarm, Valve, Compressor,
     SimulationRun, SimulationTimeSeriesData
 )
-from .postgres_tsdb_service import get_postgres_tsdb_service
+from . import pipeline_physics
+from .postgres_tsdb_service import (
+    get_postgres_tsdb_service, BackgroundSimulationDataWriter
+)
 
 logger = logging.getLogger(__name__)
 
+class _UniformBuffer:
+    """
+    Buffered uniform [0, 1) draws from numpy's PCG64 generator.
+
+    Refilling a contiguous block is far cheaper per draw than calling the
+    stdlib Mersenne Twister through the interpreter for every PLC scan.
+    """
+
+    def __init__(self, size=1 << 14):
+        self._rng = np.random.default_rng()
+        self._size = size
+        self._buf = self._rng.random(size)
+        self._idx = 0
+
+    def random(self):
+        """Next uniform draw in [0, 1) as a plain float"""
+        if self._idx >= self._size:
+            self._buf = self._rng.random(self._size)
+            self._idx = 0
+        value = self._buf[self._idx]
+        self._idx += 1
+        return float(value)
+
+    def uniform(self, low, high):
+        """Next uniform draw in [low, high) as a plain float"""
+        return low + (high - low) * self.random()
+
+_uniform = _UniformBuffer()
+
 class PLCSimulator:
     """Simplified PLC simulation logic"""
-    
-    def __init__(self, plc):
+
+    def __init__(self, plc, alarm_queue=None):
         self.plc = plc
+        # Raised alarms are appended here and bulk-inserted by the
+        # engine at the end of the scan cycle; standalone use (no
+        # queue) keeps the old insert-per-alarm behaviour.
+        self.alarm_queue = alarm_queue
         self.integral_error = 0.0
         self.last_error = 0.0
+        # Sensor keys for this PLC's node, formatted once instead of
+        # on every scan.
+        node_id = plc.node.node_id if plc.node else ''
+        self.pressure_key = f'pressure_{node_id}'
+        self.temperature_key = f'temperature_{node_id}'
+        self.flow_key = f'flow_{node_id}'
+        # Network-wide reading maxima, set by the engine once per scan
+        # cycle for the emergency-shutdown logic.
+        self.sensor_maxima = None
+        # Bind this PLC's logic method once; unknown types scan to {}.
+        logic = self._DISPATCH.get(plc.plc_type)
+        self._logic = logic.__get__(self) if logic is not None else None
     
     def execute_scan(self, sensor_data, simulation_time):
         """Execute PLC scan cycle"""
         try:
-            if self.plc.plc_type == 'PRESSURE_CONTROL':
-                return self._pressure_control_logic(sensor_data, simulation_time)
-            elif self.plc.plc_type == 'FLOW_REGULATION':
-                return self._flow_regulation_logic(sensor_data, simulation_time)
-            elif self.plc.plc_type == 'COMPRESSOR_MANAGEMENT':
-                return self._compressor_management_logic(sensor_data, simulation_time)
-            elif self.plc.plc_type == 'VALVE_CONTROL':
-                return self._valve_control_logic(sensor_data, simulation_time)
-            elif self.plc.plc_type == 'SAFETY_MONITORING':
-                return self._safety_monitoring_logic(sensor_data, simulation_time)
-            elif self.plc.plc_type == 'LEAK_DETECTION':
-                return self._leak_detection_logic(sensor_data, simulation_time)
-            elif self.plc.plc_type == 'TEMPERATURE_CONTROL':
-                return self._temperature_control_logic(sensor_data, simulation_time)
-            elif self.plc.plc_type == 'EMERGENCY_SHUTDOWN':
-                return self._emergency_shutdown_logic(sensor_data, simulation_time)
-            
-            return {}
-            
+            if self._logic is None:
+                return {}
+            return self._logic(sensor_data, simulation_time)
+
         except Exception as e:
             logger.error(f"PLC {self.plc.plc_id} scan error: {e}")
             return {}
     
     def _pressure_control_logic(self, sensor_data, simulation_time):
         """Pressure control PLC logic"""
-        node_id = self.plc.node.node_id
-        current_pressure = sensor_data.get(f'pressure_{node_id}', 50.0)
+        current_pressure = sensor_data.get(self.pressure_key, 50.0)
         
         # Use Node's set_pressure as setpoint (manual override potential)
         setpoint = self.plc.node.set_pressure
@@ -84,8 +116,7 @@ class PLCSimulator:
     
     def _flow_regulation_logic(self, sensor_data, simulation_time):
         """Flow regulation PLC logic"""
-        node_id = self.plc.node.node_id
-        current_flow = sensor_data.get(f'flow_{node_id}', 100.0)
+        current_flow = sensor_data.get(self.flow_key, 100.0)
         
         # Use Node's set_flow as target flow (manual override potential)
         target_flow = self.plc.node.set_flow 
@@ -104,8 +135,7 @@ class PLCSimulator:
     
     def _compressor_management_logic(self, sensor_data, simulation_time):
         """Compressor management PLC logic"""
-        node_id = self.plc.node.node_id
-        pressure = sensor_data.get(f'pressure_{node_id}', 50.0)
+        pressure = sensor_data.get(self.pressure_key, 50.0)
         
         # Simple logic: start compressor if pressure is low
         compressor_start_pressure = 45.0
@@ -146,7 +176,7 @@ class PLCSimulator:
             # If the valve is under PLC control (set_position = -1.0)
             if valve.set_position < 0:
                 # Calculate new position (simple random movement)
-                new_position = valve.position + random.uniform(-1.0, 1.0)
+                new_position = valve.position + _uniform.uniform(-1.0, 1.0)
                 positions[valve.valve_id] = max(0, min(100, new_position))
             else:
                 # If set_position is manual, PLC outputs the current manual setpoint
@@ -156,9 +186,8 @@ class PLCSimulator:
     
     def _safety_monitoring_logic(self, sensor_data, simulation_time):
         """Safety monitoring PLC logic"""
-        node_id = self.plc.node.node_id
-        pressure = sensor_data.get(f'pressure_{node_id}', 50.0)
-        temperature = sensor_data.get(f'temperature_{node_id}', 20.0)
+        pressure = sensor_data.get(self.pressure_key, 50.0)
+        temperature = sensor_data.get(self.temperature_key, 20.0)
         
         safety_status = {}
         
@@ -182,7 +211,7 @@ class PLCSimulator:
     
     def _leak_detection_logic(self, sensor_data, simulation_time):
         """Leak detection PLC logic"""
-        leak_detected = random.random() < 0.0001 # Reduced chance for demo
+        leak_detected = _uniform.random() < 0.0001 # Reduced chance for demo
         
         if leak_detected:
             self._create_alarm('GAS_LEAK', 'CRITICAL', 'Gas leak detected!')
@@ -194,8 +223,7 @@ class PLCSimulator:
     
     def _temperature_control_logic(self, sensor_data, simulation_time):
         """Temperature control PLC logic"""
-        node_id = self.plc.node.node_id
-        temperature = sensor_data.get(f'temperature_{node_id}', 20.0)
+        temperature = sensor_data.get(self.temperature_key, 20.0)
         
         target_temp = 25.0
         temp_error = target_temp - temperature
@@ -212,8 +240,14 @@ class PLCSimulator:
     
     def _emergency_shutdown_logic(self, sensor_data, simulation_time):
         """Emergency shutdown PLC logic"""
-        pressure_ok = all(s.current_value <= 80.0 for s in Sensor.objects.filter(sensor_type='pressure'))
-        temperature_ok = all(s.current_value <= 70.0 for s in Sensor.objects.filter(sensor_type='temperature'))
+        if self.sensor_maxima is not None:
+            # Maxima were reduced once over the sensor value array for
+            # the whole cycle; this scan is two float comparisons.
+            pressure_ok = self.sensor_maxima['pressure'] <= 80.0
+            temperature_ok = self.sensor_maxima['temperature'] <= 70.0
+        else:
+            pressure_ok = all(s.current_value <= 80.0 for s in Sensor.objects.filter(sensor_type='pressure'))
+            temperature_ok = all(s.current_value <= 70.0 for s in Sensor.objects.filter(sensor_type='temperature'))
         
         emergency_stop = not (pressure_ok and temperature_ok)
         
@@ -229,23 +263,115 @@ class PLCSimulator:
     def _create_alarm(self, alarm_id, severity, message):
         """Create PLC alarm"""
         try:
-            PLCAlarm.objects.create(
+            alarm = PLCAlarm(
                 plc=self.plc,
                 alarm_id=alarm_id,
                 severity=severity,
                 message=message
             )
+            if self.alarm_queue is not None:
+                self.alarm_queue.append(alarm)
+            else:
+                alarm.save()
             logger.warning(f"PLC {self.plc.plc_id}: {severity} alarm - {message}")
         except Exception as e:
             logger.error(f"Error creating alarm: {e}")
 
+    # PLC type -> logic method, resolved once per simulator instead of
+    # walking an if/elif ladder on every scan.
+    _DISPATCH = {
+        'PRESSURE_CONTROL': _pressure_control_logic,
+        'FLOW_REGULATION': _flow_regulation_logic,
+        'COMPRESSOR_MANAGEMENT': _compressor_management_logic,
+        'VALVE_CONTROL': _valve_control_logic,
+        'SAFETY_MONITORING': _safety_monitoring_logic,
+        'LEAK_DETECTION': _leak_detection_logic,
+        'TEMPERATURE_CONTROL': _temperature_control_logic,
+        'EMERGENCY_SHUTDOWN': _emergency_shutdown_logic,
+    }
+
 class SimulationEngine:
     """Django-based Python-only simulation engine"""
-    
+
+    # Sensor samples are pre-aggregated in memory: one
+    # sensor_aggregate row (min/max/avg/n) per window answers the
+    # common dashboard queries, so the raw per-tick stream only needs
+    # to be stored downsampled.
+    sensor_raw_every = 10     # keep one raw sensor sample per N steps
+    aggregate_window = 60.0   # seconds covered by one aggregate row
+
     def __init__(self):
         self.running = False
         self.simulation_thread = None
         self.tsdb_service = get_postgres_tsdb_service()
+        # Static structure-of-arrays view of the network topology
+        # (type codes, pipe endpoint indices); see _network_topology.
+        self._topology_cache = None
+        self._sensor_cache = None
+        self._sensor_values = None
+        # Running min/max/sum/count per sensor for the current
+        # aggregation window; see _write_to_postgres.
+        self._agg_buffer = {}
+        self._agg_window_start = 0.0
+        self._sensor_write_count = 0
+        # PLCSimulator instances persist across steps so their PID
+        # state and precomputed sensor keys survive the scan cycle.
+        self._plc_simulators = {}
+        # Live PLC outputs mirrored in memory for the status views.
+        # Outputs are persisted to the time-series store every step, so
+        # the per-step JSONB write-back to the PLC row is skipped.
+        self.plc_last_outputs = {}
+        self.plc_last_scan = None
+        # Per-run object caches, populated by _simulation_loop. The
+        # working set is fixed for the life of a run, so each category
+        # is fetched once instead of re-hydrated every step.
+        self.nodes = []
+        self.pipes = []
+        self.sensors = []
+        self.plcs = []
+        self.valves = []
+        self.compressors = []
+
+    def _network_topology(self, network, nodes, pipes):
+        """Static SoA topology arrays for a network, cached across steps.
+
+        Node type codes and pipe endpoint index arrays never change for
+        the life of a network, so they are built once instead of per
+        step. nodes/pipes must be ordered by pk (the cache is keyed to
+        that ordering); a reimport produces a new network pk, which
+        invalidates the cache.
+        """
+        cache = self._topology_cache
+        if cache is None or cache['network_pk'] != network.pk \
+                or cache['node_pks'] != [node.pk for node in nodes] \
+                or cache['pipe_pks'] != [pipe.pk for pipe in pipes]:
+            node_index = {node.pk: i for i, node in enumerate(nodes)}
+            cache = self._topology_cache = {
+                'network_pk': network.pk,
+                'node_pks': [node.pk for node in nodes],
+                'pipe_pks': [pipe.pk for pipe in pipes],
+                'node_type': np.fromiter(
+                    (pipeline_physics.NODE_TYPE_CODES[node.node_type]
+                     for node in nodes),
+                    dtype=np.int8, count=len(nodes)),
+                'from_idx': np.fromiter(
+                    (node_index[pipe.from_node_id] for pipe in pipes),
+                    dtype=np.intp, count=len(pipes)),
+                'to_idx': np.fromiter(
+                    (node_index[pipe.to_node_id] for pipe in pipes),
+                    dtype=np.intp, count=len(pipes)),
+                # pressure_min is fixed at import time, so the sink
+                # base-pressure term is precomputed here once.
+                'sink_base_pressure': np.array(
+                    [node.pressure_min for node in nodes]) * 1.5,
+                # Scratch buffers for the per-step dynamic values,
+                # refilled in place instead of reallocated every step.
+                'set_pressure': np.empty(len(nodes)),
+                'set_flow': np.empty(len(nodes)),
+                'current_flow': np.empty(len(nodes)),
+                'openness': np.empty(len(pipes)),
+            }
+        return cache
 
     def start_simulation(self, network_id, duration=600, time_step=1.0):
         """Start a new simulation run"""
@@ -298,45 +424,82 @@ class SimulationEngine:
         
         start_time = time.time()
         step = 0
-        
+
+        # Loop-invariant run attributes, read once instead of through
+        # model attribute lookups on every step.
+        network = simulation_run.network
+        time_step = simulation_run.time_step
+        duration = simulation_run.duration
+        run_id = simulation_run.run_id
+
+        # Fetch the working set once; the step loop operates on these
+        # cached instances and flushes changes back with bulk_update.
+        # The default managers pull the related node/pipe/plc rows in
+        # the same query.
+        self.nodes = list(network.nodes.order_by('pk'))
+        self.pipes = list(network.pipes.order_by('pk'))
+        self.sensors = list(Sensor.objects.filter(
+            node__network=network, is_active=True))
+        self.plcs = list(PLC.objects.filter(
+            node__network=network, is_active=True))
+        self.valves = list(Valve.objects.filter(
+            pipe__network=network, is_operational=True))
+        self.compressors = list(Compressor.objects.filter(node__network=network))
+
+        # Background writer: queueing a point is a plain append; a
+        # consumer thread does the batched COPY flushes, so database
+        # I/O never stalls a simulation step.
+        data_writer = BackgroundSimulationDataWriter(simulation_run)
+
+        # Fresh aggregation window per run.
+        self._agg_buffer = {}
+        self._agg_window_start = 0.0
+        self._sensor_write_count = 0
+
         try:
-            while self.running and step * simulation_run.time_step < simulation_run.duration:
+            while self.running and step * time_step < duration:
                 step_start = time.time()
-                simulation_time = step * simulation_run.time_step
-                
-                # Update sensor readings
-                sensor_data = self._update_sensors(simulation_run.network, simulation_time)
-                
-                # Execute PLC scans
-                plc_data = self._execute_plcs(simulation_run.network, sensor_data, simulation_time)
-                
-                # Update valve positions (uses PLC data or manual override)
-                valve_data = self._update_valves(simulation_run.network, plc_data, simulation_time)
-                
-                # Update compressor states (uses PLC data or manual override)
-                compressor_data = self._update_compressors(simulation_run.network, plc_data, simulation_time) # New update
-                
-                # Update physics simulation (incorporates valve/compressor changes and manual node setpoints)
-                self._update_physics(simulation_run.network, sensor_data, simulation_time)
-                
+                simulation_time = step * time_step
+
+                # One transaction per step: every bulk UPDATE below
+                # commits in a single fsync instead of one per statement.
+                with transaction.atomic():
+                    # Pick up manual setpoint overrides made via the API
+                    self._refresh_setpoints(network)
+
+                    # Update sensor readings
+                    sensor_data = self._update_sensors(network, simulation_time)
+
+                    # Execute PLC scans
+                    plc_data = self._execute_plcs(network, sensor_data, simulation_time)
+
+                    # Update valve positions (uses PLC data or manual override)
+                    valve_data = self._update_valves(network, plc_data, simulation_time)
+
+                    # Update compressor states (uses PLC data or manual override)
+                    compressor_data = self._update_compressors(network, plc_data, simulation_time) # New update
+
+                    # Update physics simulation (incorporates valve/compressor changes and manual node setpoints)
+                    self._update_physics(network, sensor_data, simulation_time)
+
                 # Collect node and pipe data
-                node_data = self._collect_node_data(simulation_run.network)
-                pipe_data = self._collect_pipe_data(simulation_run.network)
-                
+                node_data = self._collect_node_data(network)
+                pipe_data = self._collect_pipe_data(network)
+
                 # Store simulation data to PostgreSQL TSDB
-                self._write_to_postgres(simulation_run, simulation_time, 
-                                      sensor_data, plc_data, valve_data, 
+                self._write_to_postgres(data_writer, simulation_time,
+                                      sensor_data, plc_data, valve_data,
                                       node_data, pipe_data, compressor_data)
-                
+
                 # Log progress every 60 steps
                 if step % 60 == 0:
-                    logger.info(f"Simulation {simulation_run.run_id}: Step {step}, Time {simulation_time:.1f}s")
-                
+                    logger.info(f"Simulation {run_id}: Step {step}, Time {simulation_time:.1f}s")
+
                 # Wait for next time step
                 elapsed = time.time() - step_start
-                if elapsed < simulation_run.time_step:
-                    time.sleep(simulation_run.time_step - elapsed)
-                
+                if elapsed < time_step:
+                    time.sleep(time_step - elapsed)
+
                 step += 1
             
             # Finalize simulation
@@ -355,57 +518,104 @@ class SimulationEngine:
             simulation_run.save()
         
         finally:
+            # Persist whatever is still queued before the thread exits.
+            if self._agg_buffer:
+                self._flush_sensor_aggregates(data_writer.add,
+                                              step * time_step)
+            data_writer.close()
             self.running = False
-            
-    def _write_to_postgres(self, simulation_run, simulation_time, 
+
+    def _flush_sensor_aggregates(self, add, window_end):
+        """Emit one sensor_aggregate row per sensor and reset the window"""
+        window_start = self._agg_window_start
+        for sensor_id, agg in self._agg_buffer.items():
+            add(window_end, 'sensor_aggregate', sensor_id, {
+                'window_start': window_start,
+                'min': agg['min'],
+                'max': agg['max'],
+                'avg': agg['sum'] / agg['n'],
+                'n': agg['n'],
+            })
+        self._agg_buffer.clear()
+        self._agg_window_start = window_end
+
+    def _refresh_setpoints(self, network):
+        """Re-read manual-override columns into the cached objects.
+
+        The object caches live for the whole run, but operators can
+        change setpoints through the API mid-run; one narrow
+        values_list per category picks those changes up without
+        re-hydrating any instances.
+        """
+        node_sp = {pk: row for pk, *row in network.nodes.values_list(
+            'pk', 'set_pressure', 'set_flow')}
+        for node in self.nodes:
+            node.set_pressure, node.set_flow = node_sp[node.pk]
+
+        # The PLC cache holds its own Node instances (joined in by
+        # PLCManager), and the control logic reads setpoints through
+        # plc.node — refresh those too or the PID would keep regulating
+        # toward a stale setpoint while physics applies the new one.
+        for plc in self.plcs:
+            row = node_sp.get(plc.node_id)
+            if row is not None:
+                plc.node.set_pressure, plc.node.set_flow = row
+
+        valve_sp = dict(Valve.objects.filter(
+            pipe__network=network).values_list('pk', 'set_position'))
+        for valve in self.valves:
+            valve.set_position = valve_sp[valve.pk]
+
+        comp_sp = {pk: row for pk, *row in Compressor.objects.filter(
+            node__network=network).values_list('pk', 'set_command', 'set_speed')}
+        for compressor in self.compressors:
+            compressor.set_command, compressor.set_speed = comp_sp[compressor.pk]
+
+    def _write_to_postgres(self, data_writer, simulation_time,
                           sensor_data, plc_data, valve_data, node_data, pipe_data, compressor_data):
-        """Write simulation data to the PostgreSQL TSDB table"""
+        """Queue one step's simulation data on the buffered TSDB writer"""
         try:
-            data_points = []
-            
-            # Sensor data
+            add = data_writer.add
+
+            # Sensor data: fold every sample into the running window
+            # aggregates, but store the raw tick only every Nth step.
+            keep_raw = self._sensor_write_count % self.sensor_raw_every == 0
+            self._sensor_write_count += 1
+            buffer = self._agg_buffer
             for sensor_id, value in sensor_data.items():
-                data_points.append(SimulationTimeSeriesData(
-                    simulation_run=simulation_run, timestamp=simulation_time, 
-                    measurement_type='sensor_reading', object_id=sensor_id, 
-                    data={'value': value}
-                ))
-            
+                agg = buffer.get(sensor_id)
+                if agg is None:
+                    agg = buffer[sensor_id] = {
+                        'sum': 0.0, 'min': value, 'max': value, 'n': 0}
+                agg['sum'] += value
+                agg['n'] += 1
+                if value < agg['min']:
+                    agg['min'] = value
+                elif value > agg['max']:
+                    agg['max'] = value
+                if keep_raw:
+                    add(simulation_time, 'sensor_reading', sensor_id,
+                        {'value': value})
+
+            if simulation_time - self._agg_window_start >= self.aggregate_window:
+                self._flush_sensor_aggregates(add, simulation_time)
+
             # PLC data
             for plc_id, outputs in plc_data.items():
-                data_points.append(SimulationTimeSeriesData(
-                    simulation_run=simulation_run, timestamp=simulation_time, 
-                    measurement_type='plc_output', object_id=plc_id, 
-                    data=outputs
-                ))
-            
+                add(simulation_time, 'plc_output', plc_id, outputs)
+
             # Node data
             for node_id, data in node_data.items():
-                data_points.append(SimulationTimeSeriesData(
-                    simulation_run=simulation_run, timestamp=simulation_time, 
-                    measurement_type='node_state', object_id=node_id, 
-                    data=data
-                ))
-                
+                add(simulation_time, 'node_state', node_id, data)
+
             # Pipe data
             for pipe_id, data in pipe_data.items():
-                data_points.append(SimulationTimeSeriesData(
-                    simulation_run=simulation_run, timestamp=simulation_time, 
-                    measurement_type='pipe_state', object_id=pipe_id, 
-                    data=data
-                ))
-            
+                add(simulation_time, 'pipe_state', pipe_id, data)
+
             # Compressor data
             for comp_id, data in compressor_data.items():
-                data_points.append(SimulationTimeSeriesData(
-                    simulation_run=simulation_run, timestamp=simulation_time,
-                    measurement_type='compressor_state', object_id=comp_id,
-                    data=data
-                ))
-
-            # Bulk create for performance
-            SimulationTimeSeriesData.objects.bulk_create(data_points)
-            
+                add(simulation_time, 'compressor_state', comp_id, data)
+
         except Exception as e:
             logger.error(f"Failed to write simulation data to PostgreSQL: {e}")
     
@@ -546,100 +756,176 @@ class SimulationEngine:
         }
         return parameters.get(plc_type, {})
     
+    def _sensor_arrays(self):
+        """Static per-sensor noise parameters, cached for the run.
+
+        Noise sigma and the non-negative clamp depend only on the
+        sensor type, so they are built once per sensor cache; the base
+        array is a reusable scratch buffer refilled every step.
+        """
+        cache = self._sensor_cache
+        pks = [sensor.pk for sensor in self.sensors]
+        if cache is None or cache['pks'] != pks:
+            sigmas = {'pressure': 0.1, 'temperature': 0.5, 'flow': 2.0}
+            sigma = [sigmas.get(sensor.sensor_type, 1.0)
+                     for sensor in self.sensors]
+            clamp = [sensor.sensor_type != 'temperature'
+                     for sensor in self.sensors]
+            cache = self._sensor_cache = {
+                'pks': pks,
+                'sigma': np.array(sigma),
+                'clamp_idx': np.flatnonzero(clamp),
+                'pressure_idx': np.flatnonzero(
+                    [s.sensor_type == 'pressure' for s in self.sensors]),
+                'temperature_idx': np.flatnonzero(
+                    [s.sensor_type == 'temperature' for s in self.sensors]),
+                'base': np.empty(len(pks)),
+            }
+        return cache
+
     def _update_sensors(self, network, simulation_time):
         """Update all sensor readings"""
-        sensor_data = {}
-        
-        for sensor in Sensor.objects.filter(node__network=network, is_active=True):
-            # Simulate sensor readings with noise
+        sensors = self.sensors
+        if not sensors:
+            return {}
+
+        # Gather the true values into a scratch array, then apply the
+        # noise and clamping as single whole-array operations.
+        arrays = self._sensor_arrays()
+        base = arrays['base']
+        for i, sensor in enumerate(sensors):
             if sensor.sensor_type == 'pressure':
-                base_value = sensor.node.current_pressure if sensor.node else 50.0
-                noise = random.gauss(0, 0.1)
-                sensor.current_value = max(0, base_value + noise)
-            
+                base[i] = sensor.node.current_pressure if sensor.node else 50.0
             elif sensor.sensor_type == 'temperature':
-                base_value = sensor.node.gas_temperature if sensor.node else 20.0
-                noise = random.gauss(0, 0.5)
-                sensor.current_value = base_value + noise
-            
-            elif sensor.sensor_type == 'flow':
-                if sensor.node:
-                    # Nodes (Sources/Sinks) expose their set flow in 1000m³/h (from set_flow)
-                    base_value = sensor.node.set_flow 
-                elif sensor.pipe:
-                    # Pipes expose their internal m³/s flow
-                    base_value = pipe.current_flow * 3600  # Convert m³/s to m³/h
-                else:
-                    base_value = 100.0
-                
-                noise = random.gauss(0, 2.0)
-                sensor.current_value = max(0, base_value + noise)
-            
-            sensor.save()
-            sensor_data[sensor.sensor_id] = sensor.current_value
-        
+                base[i] = sensor.node.gas_temperature if sensor.node else 20.0
+            elif sensor.node:
+                # Nodes (Sources/Sinks) expose their set flow in 1000m³/h (from set_flow)
+                base[i] = sensor.node.set_flow
+            elif sensor.pipe:
+                # Pipes expose their internal m³/s flow
+                base[i] = sensor.pipe.current_flow * 3600  # Convert m³/s to m³/h
+            else:
+                base[i] = 100.0
+
+        values = pipeline_physics.sensor_readings(
+            base, arrays['sigma'], arrays['clamp_idx'])
+        self._sensor_values = values
+
+        sensor_data = {}
+        for sensor, value in zip(sensors, values.tolist()):
+            sensor.current_value = value
+            sensor_data[sensor.sensor_id] = value
+
+        # One UPDATE statement per batch instead of one per sensor.
+        Sensor.objects.bulk_update(sensors, ['current_value'], batch_size=500)
+
         return sensor_data
     
     def _update_physics(self, network, sensor_data, simulation_time):
         """Update physics simulation - incorporates valve/compressor effects and manual node setpoints"""
-        
-        # 1. Apply Node Setpoints (Pressure and Flow)
-        for node in network.nodes.all():
-            if node.node_type == 'source':
-                # Sources enforce the user's set pressure/flow (user sets one, system calculates the other)
-                node.current_pressure = node.set_pressure + random.gauss(0, 0.5)
-                # The flow will be dynamically calculated by the connected pipes, but we use the set flow as a base
-                if node.set_flow > 0:
-                    node.current_flow = node.set_flow
-                else:
-                    node.current_flow = 100.0 + random.gauss(0, 10.0)
-            
-            elif node.node_type == 'sink':
-                # Sinks regulate their flow based on set_flow
-                node.current_flow = node.set_flow
-                node.current_pressure = node.pressure_min * 1.5 + random.gauss(0, 0.5)
-            
-            else:  # innode (Junctions)
-                # Junctions pressure is calculated based on flow dynamics (simplification: average of connected pipes)
-                node.current_pressure = 50.0 + random.gauss(0, 1.0) 
-            
-            node.save()
+        nodes = self.nodes
+        pipes = self.pipes
+        if not nodes:
+            return
+
+        topology = self._network_topology(network, nodes, pipes)
+
+        # 1. Apply Node Setpoints (Pressure and Flow), vectorized.
+        # Sources enforce the user's set pressure/flow, sinks regulate
+        # flow from set_flow, junction pressure is a flow-dynamics
+        # simplification — same rules as before, now as array ops.
+        set_pressure = topology['set_pressure']
+        set_flow = topology['set_flow']
+        current_flow = topology['current_flow']
+        for i, node in enumerate(nodes):
+            set_pressure[i] = node.set_pressure
+            set_flow[i] = node.set_flow
+            current_flow[i] = node.current_flow
+
+        pressure, flow = pipeline_physics.update_node_state(
+            topology['node_type'], set_pressure, set_flow,
+            topology['sink_base_pressure'], current_flow,
+        )
+        for node, p, f in zip(nodes, pressure.tolist(), flow.tolist()):
+            node.current_pressure = p
+            node.current_flow = f
+        Node.objects.bulk_update(
+            nodes, ['current_pressure', 'current_flow'], batch_size=500)
 
         # 2. Update Pipe Flows (incorporates Valve positions)
-        for pipe in network.pipes.all():
-            valve = pipe.valves.first()
-            valve_openness = valve.position / 100.0 if valve else 1.0
+        if not pipes:
+            return
+        openness = topology['openness']
+        valve_by_pipe = {valve.pipe_id: valve for valve in self.valves}
+        for i, pipe in enumerate(pipes):
+            valve = valve_by_pipe.get(pipe.pk)
+            openness[i] = valve.position / 100.0 if valve else 1.0
 
-            # Simplified flow calculation incorporating valve restriction
-            dp = pipe.from_node.current_pressure - pipe.to_node.current_pressure
-            
-            # The flow is proportional to pressure difference and valve openness
-            base_flow = dp * 2.0 * valve_openness
-            pipe.current_flow = max(0, base_flow + random.gauss(0, 0.1))
-            pipe.save()
+        pipe_flows = pipeline_physics.compute_pipe_flows(
+            pressure, topology['from_idx'], topology['to_idx'], openness)
+        for pipe, f in zip(pipes, pipe_flows.tolist()):
+            pipe.current_flow = f
+        Pipe.objects.bulk_update(pipes, ['current_flow'], batch_size=500)
 
     def _execute_plcs(self, network, sensor_data, simulation_time):
         """Execute all PLC scans"""
         plc_data = {}
-        
-        for plc in PLC.objects.filter(node__network=network, is_active=True):
-            simulator = PLCSimulator(plc)
+        scan_time = timezone.now()  # One clock read for the whole scan cycle
+
+        plcs = self.plcs
+        alarm_queue = []
+        maxima = self._sensor_maxima()
+        simulators = self._plc_simulators
+        for plc in plcs:
+            simulator = simulators.get(plc.pk)
+            if simulator is None:
+                simulator = simulators[plc.pk] = PLCSimulator(plc)
+            simulator.alarm_queue = alarm_queue
+            simulator.sensor_maxima = maxima
             outputs = simulator.execute_scan(sensor_data, simulation_time)
-            
-            # Update PLC outputs
+
+            # Update PLC outputs on the in-memory instance only; the
+            # row write-back would rewrite the JSONB column per step
+            # for state the TSDB already records as plc_output points.
             plc.outputs = outputs
-            plc.last_scan = timezone.now() # Update last scan time
-            plc.save()
-            
+            plc.last_scan = scan_time # Update last scan time
+
             plc_data[plc.plc_id] = outputs
-        
+
+        self.plc_last_outputs.update(plc_data)
+        self.plc_last_scan = scan_time
+
+        # All alarms raised this cycle land in one INSERT.
+        if alarm_queue:
+            PLCAlarm.objects.bulk_create(alarm_queue, batch_size=500)
+
         return plc_data
     
+    def _sensor_maxima(self):
+        """Network-wide max pressure and temperature readings.
+
+        One vectorized reduction over the current sensor value array,
+        shared by all PLCs in the cycle; None until the first sensor
+        update (the PLC logic then falls back to querying sensors).
+        """
+        values = self._sensor_values
+        if values is None:
+            return None
+        arrays = self._sensor_arrays()
+        p_idx = arrays['pressure_idx']
+        t_idx = arrays['temperature_idx']
+        return {
+            'pressure': float(values[p_idx].max()) if p_idx.size else 0.0,
+            'temperature': float(values[t_idx].max()) if t_idx.size else 0.0,
+        }
+
     def _update_valves(self, network, plc_data, simulation_time):
         """Update valve positions based on PLC outputs OR manual setpoints"""
         valve_data = {}
-        
-        for valve in Valve.objects.filter(pipe__network=network, is_operational=True):
+        movement_time = timezone.now()  # One clock read per update cycle
+        valves_to_update = []
+
+        for valve in self.valves:
             
             if valve.set_position >= 0:
                 # MANUAL OVERRIDE: Directly set the valve position to the setpoint
@@ -666,7 +952,7 @@ class SimulationEngine:
             
             else:
                 # NO CONTROL/DEFAULT: Apply small random change
-                new_position = valve.position + random.uniform(-0.1, 0.1)
+                new_position = valve.position + _uniform.uniform(-0.1, 0.1)
                 control_source = 'Default'
 
             # Apply limits and save
@@ -674,18 +960,22 @@ class SimulationEngine:
             
             if abs(valve.position - new_position) > 0.1: # Only save if change is significant
                 valve.position = new_position
-                valve.last_movement = timezone.now()
-                valve.save()
-            
+                valve.last_movement = movement_time
+                valves_to_update.append(valve)
+
             valve_data[valve.valve_id] = {'position': valve.position, 'control_source': control_source}
-        
+
+        if valves_to_update:
+            Valve.objects.bulk_update(
+                valves_to_update, ['position', 'last_movement'], batch_size=500)
+
         return valve_data
 
     def _update_compressors(self, network, plc_data, simulation_time):
         """Update compressor states based on PLC outputs OR manual setpoints"""
         compressor_data = {}
         
-        for compressor in Compressor.objects.filter(node__network=network):
+        for compressor in self.compressors:
             
             # 1. Determine target state based on override/auto
             if compressor.set_command != 'AUTO':
@@ -749,9 +1039,10 @@ class SimulationEngine:
 
     def _collect_node_data(self, network):
         """Collect current node states"""
-        node_data = {}
-        for node in network.nodes.all():
-            node_data[node.node_id] = {
+        # The cached instances already hold the freshly computed step
+        # values, so this scan touches no queries at all.
+        return {
+            node.node_id: {
                 'pressure': node.current_pressure,
                 'flow': node.current_flow,
                 'temperature': node.gas_temperature,
@@ -759,16 +1050,18 @@ class SimulationEngine:
                 'set_pressure': node.set_pressure,
                 'set_flow': node.set_flow,
             }
-        return node_data
-    
+            for node in self.nodes
+        }
+
     def _collect_pipe_data(self, network):
         """Collect current pipe states"""
-        pipe_data = {}
-        for pipe in network.pipes.all():
-            pipe_data[pipe.pipe_id] = {
+        # Endpoint nodes were joined in when the pipe cache was built.
+        return {
+            pipe.pipe_id: {
                 'flow': pipe.current_flow,
                 'from_node': pipe.from_node.node_id,
                 'to_node': pipe.to_node.node_id,
-                'active': pipe.is_active
+                'active': pipe.is_active,
             }
-        return pipe_data
+            for pipe in self.pipes
+        }
@@ -0,0 +1,33 @@
+from django.urls import path
+from . import views
+
+# All simulator API routes, mounted under /api/ by gas_sim.urls. Keeping
+# them in one nested resolver lets Django skip the whole block early for
+# non-API requests instead of testing a flat list of patterns.
+urlpatterns = [
+    path('', views.api_root, name='api_root'),
+
+    path('network/load/', views.load_gaslib_network, name='load_gaslib_network'),
+    path('simulation/start/', views.start_simulation, name='start_simulation'),
+    path('simulation/stop/', views.stop_simulation, name='stop_simulation'),
+    path('simulation/status/', views.simulation_status, name='simulation_status'),
+    path('network/<int:network_id>/', views.network_data, name='network_data'),
+    path('simulation/<int:simulation_id>/data/', views.simulation_data, name='simulation_data'),
+    path('simulation/<int:simulation_id>/export/', views.export_simulation_data, name='export_simulation_data'),
+
+    # Legacy aliases, still documented in README.md and used by older
+    # external callers.
+    path('start/', views.start_simulation, name='start_simulation_legacy'),
+    path('status/', views.simulation_status, name='simulation_status_legacy'),
+
+    path('alarms/', views.alarms_list, name='alarms_list'),
+    path('alarms/<int:alarm_id>/acknowledge/', views.acknowledge_alarm, name='acknowledge_alarm'),
+    path('plcs/status/', views.plc_status, name='plc_status'),
+    path('sensors/readings/', views.sensor_readings, name='sensor_readings'),
+
+    # Direct control endpoints
+    path('control/valve/<str:valve_id>/', views.control_valve, name='control_valve'),
+    path('control/valve/<str:valve_id>/auto/', views.control_valve_auto, name='control_valve_auto'),
+    path('control/compressor/<str:compressor_id>/', views.control_compressor, name='control_compressor'),
+    path('control/node/<str:node_id>/', views.control_node, name='control_node'),
+]
@@ -1,5 +1,5 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.exceptions import ValidationError
@@ -24,6 +24,28 @@ logger = logging.getLogger(__name__)
 # Global simulation engine instance
 simulation_engine = SimulationEngine()
 
+# Bundled default network, resolved once at import time.
+GASLIB24_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'GasLib-24-v1-20211130',
+    'GasLib-24-v1-20211130.net'
+)
+
+def _import_default_network():
+    """Parse and import the bundled GasLib-24 file.
+
+    Shared by the auto-load path and the explicit reload endpoint so
+    the file resolution / parse / transaction logic exists once.
+    Raises FileNotFoundError if the bundled file is missing.
+    """
+    if not os.path.exists(GASLIB24_FILE):
+        raise FileNotFoundError(
+            f'GasLib-24 file not found at {GASLIB24_FILE}')
+
+    parser = GasLibParser(GASLIB24_FILE)
+    with transaction.atomic():
+        return parser.parse_and_create_network()
+
 def _ensure_network_loaded():
     """
     Checks if any network is loaded. If not, loads the default GasLib-24 network.
@@ -43,25 +65,8 @@ def _ensure_network_loaded():
     if GasNetwork.objects.count() == 0:
         logger.info("No networks found in database. Loading default GasLib-24 network...")
         try:
-            # Path to GasLib-24 file
-            gaslib_file = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-                'GasLib-24-v1-20211130',
-                'GasLib-24-v1-20211130.net'
-            )
-            
-            if not os.path.exists(gaslib_file):
-                logger.error(f"Default GasLib-24 file not found at {gaslib_file}. Cannot auto-load.")
-                return
-
-            # Parse and create network
-            parser = GasLibParser(gaslib_file)
-            
-            with transaction.atomic():
-                network = parser.parse_and_create_network()
-            
+            network = _import_default_network()
             logger.info(f"Successfully auto-loaded default network: {network.name}")
-
         except Exception as e:
             logger.error(f"Error auto-loading GasLib-24 network: {e}")
 
@@ -122,25 +127,9 @@ def index(request):
 def load_gaslib_network(request):
     """Load GasLib-24 network from XML file"""
     try:
-        # Path to GasLib-24 file
-        gaslib_file = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            'GasLib-24-v1-20211130',
-            'GasLib-24-v1-20211130.net'
-        )
-        
-        if not os.path.exists(gaslib_file):
-            return JsonResponse({
-                'status': 'error',
-                'message': f'GasLib-24 file not found at {gaslib_file}'
-            })
-        
         # Parse and create network (parser now handles deletion)
-        parser = GasLibParser(gaslib_file)
-        
-        with transaction.atomic():
-            network = parser.parse_and_create_network()
-        
+        network = _import_default_network()
+
         # NOTE: Sensors, PLCs, Valves, Compressors are initialized when simulation starts.
         logger.info(f"Successfully loaded GasLib-24 network: {network.name}")
         
@@ -509,13 +498,17 @@ def network_data(request, network_id):
         # Get PLCs data
         plcs_data = []
         for plc in PLC.objects.filter(node__network=network):
+            # Live outputs are mirrored on the engine; the PLC row is
+            # not rewritten every scan.
+            outputs = simulation_engine.plc_last_outputs.get(
+                plc.plc_id, plc.outputs)
             plcs_data.append({
                 'id': plc.plc_id,
                 'type': plc.plc_type,
                 'node': plc.node.node_id,
                 'active': plc.is_active,
                 'inputs': len(plc.inputs),
-                'outputs': len(plc.outputs),
+                'outputs': len(outputs),
                 'alarms': plc.alarms.filter(acknowledged=False).count()
             })
         
@@ -666,6 +659,11 @@ def plc_status(request):
     try:
         plcs_data = []
         for plc in PLC.objects.filter(is_active=True):
+            # Outputs and scan time come from the engine's in-memory
+            # mirror while a simulation is live.
+            outputs = simulation_engine.plc_last_outputs.get(
+                plc.plc_id, plc.outputs)
+            last_scan = simulation_engine.plc_last_scan or plc.last_scan
             plcs_data.append({
                 'id': plc.plc_id,
                 'type': plc.get_plc_type_display(),
@@ -673,10 +671,10 @@ def plc_status(request):
                 'scan_time': plc.scan_time,
                 'active': plc.is_active,
                 'inputs': len(plc.inputs),
-                'outputs': len(plc.outputs),
-                'memory_used': len(plc.memory),
+                'outputs': len(outputs),
+                'memory_used': len(plc.state.get('memory', {})),
                 'active_alarms': plc.alarms.filter(acknowledged=False).count(),
-                'last_scan': plc.last_scan.isoformat() if plc.last_scan else None
+                'last_scan': last_scan.isoformat() if last_scan else None
             })
         
         return JsonResponse({
@@ -727,7 +725,7 @@ def api_root(request):
         'api_version': '1.1',
         'simulator': 'Gas Pipeline Digital Twin - GasLib-24',
         'endpoints': {
-            'status': '/api/status/',
+            'status': '/api/simulation/status/',
             'start': '/api/simulation/start/', 
             'stop': '/api/simulation/stop/',
             'load_network': '/api/network/load/',
@@ -770,51 +768,65 @@ def export_simulation_data(request, simulation_id):
             writer.writerow([0, 'No data found for this simulation run.'])
             return response
 
-        logger.info(f"Pivoting data for simulation {simulation_run.run_id}...")
-
-        # 2. Pivot the data (group by timestamp)
-        pivoted_data = {}  # { timestamp: { col_name: value, ... } }
-        all_columns = set() # Keep track of all unique column headers
-
-        for point in data_points:
-            ts = point.timestamp
-            if ts not in pivoted_data:
-                pivoted_data[ts] = {}
-            
-            # Create a base name, e.g., "sensor_reading_pressure_node_1"
-            base_key = f"{point.measurement_type}_{point.object_id}"
-            
-            # The 'data' field is a JSON. We need to flatten it.
-            # e.g., data = {"value": 50.1} -> col_name = "sensor_reading_pressure_node_1_value"
-            # e.g., data = {"status": "RUNNING", "speed": 10000} ->
-            #      col_name_1 = "compressor_state_COMP_N04_status"
-            #      col_name_2 = "compressor_state_COMP_N04_speed"
-            
-            for key, value in point.data.items():
-                col_name = f"{base_key}_{key}"
-                all_columns.add(col_name)
-                pivoted_data[ts][col_name] = value
-
-        # 3. Create the CSV response
-        response = HttpResponse(content_type='text/csv')
+        logger.info(f"Streaming pivoted data for simulation {simulation_run.run_id}...")
+
+        # 2. First pass: collect the column headers only. Column names are a
+        # tiny set compared to the data itself, so this bounds memory to
+        # O(columns) rather than O(rows x columns).
+        all_columns = set()
+        for measurement_type, object_id, data in data_points.values_list(
+                'measurement_type', 'object_id', 'data').iterator():
+            # Create a base name, e.g., "sensor_reading_pressure_node_1",
+            # then flatten the JSON data keys into it, e.g.,
+            # data = {"value": 50.1} -> "sensor_reading_pressure_node_1_value"
+            base_key = f"{measurement_type}_{object_id}"
+            for key in data:
+                all_columns.add(f"{base_key}_{key}")
+
+        sorted_columns = sorted(all_columns)
+        column_index = {col: i for i, col in enumerate(sorted_columns)}
+
+        class _Echo:
+            """Pseudo-buffer: csv.writer 'writes' rows straight through"""
+            def write(self, value):
+                return value
+
+        writer = csv.writer(_Echo())
+
+        def stream_rows():
+            # 3. Second pass: the queryset is ordered by timestamp, so rows
+            # for one timestamp are contiguous; emit each completed row as
+            # soon as the timestamp changes instead of pivoting everything
+            # into memory first.
+            yield writer.writerow(['timestamp'] + sorted_columns)
+
+            current_ts = None
+            row = None
+            for measurement_type, object_id, data, ts in data_points.values_list(
+                    'measurement_type', 'object_id', 'data', 'timestamp').iterator():
+                if ts != current_ts:
+                    if row is not None:
+                        yield writer.writerow([current_ts] + row)
+                    current_ts = ts
+                    row = [''] * len(sorted_columns)
+
+                base_key = f"{measurement_type}_{object_id}"
+                for key, value in data.items():
+                    # Rows written after the header pass (e.g. during a
+                    # live run) can carry columns the header does not
+                    # have; skip them rather than dying mid-stream.
+                    index = column_index.get(f"{base_key}_{key}")
+                    if index is not None:
+                        row[index] = value
+
+            if row is not None:
+                yield writer.writerow([current_ts] + row)
+
+            logger.info(f"Successfully streamed CSV for simulation {simulation_run.run_id}.")
+
+        # 4. Stream the CSV response row by row.
+        response = StreamingHttpResponse(stream_rows(), content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename="simulation_data_{simulation_run.run_id}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # 4. Write Header Row
-        sorted_columns = sorted(list(all_columns))
-        writer.writerow(['timestamp'] + sorted_columns)
-        
-        # 5. Write Data Rows
-        for ts in sorted(pivoted_data.keys()):
-            row_data = pivoted_data[ts]
-            row = [ts]
-            for col in sorted_columns:
-                # Use .get() to handle missing data for a specific timestamp (pads with empty string)
-                row.append(row_data.get(col, ''))
-            writer.writerow(row)
-            
-        logger.info(f"Successfully generated CSV for simulation {simulation_run.run_id}.")
         return response
 
     except Exception as e: